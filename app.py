@@ -1,14 +1,23 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort
+import sqlite3
+import click
+from decimal import Decimal
+import orjson
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, session
+from flask.json.provider import JSONProvider
+from flask_caching import Cache
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user, login_user, logout_user, login_required
 from flask_migrate import Migrate
-from datetime import datetime, timedelta
+from sqlalchemy import event, func, update
+from sqlalchemy.engine import Engine
+from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from config import config
 
 # Initialize extensions
 db = SQLAlchemy()
+cache = Cache()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 login_manager.login_message_category = 'info'
@@ -18,16 +27,58 @@ from models.user import User
 from models.habit import Habit, HabitCompletion
 from models.wallet import Transaction, SavingsGoal
 
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent web access."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256 MiB
+    cursor.execute('PRAGMA cache_size=-64000')  # ~64 MB
+    cursor.close()
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify() and request.get_json()."""
+    
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+    
+    @staticmethod
+    def _default(obj):
+        # Money columns come back from the database as Decimal
+        if isinstance(obj, Decimal):
+            return float(obj)
+        raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self._default, option=self.option),
+            mimetype='application/json'
+        )
+
 def create_app(config_name='default'):
     """Create and configure the Flask application."""
     app = Flask(__name__)
     
     # Apply configuration
     app.config.from_object(config[config_name])
+    # Install the JSON provider before init_app, which may create the Jinja
+    # environment and with it bind the provider |tojson uses
+    app.json = OrjsonProvider(app)
     config[config_name].init_app(app)
     
     # Initialize extensions
     db.init_app(app)
+    cache.init_app(app)
     login_manager.init_app(app)
     
     # Register blueprints
@@ -46,19 +97,32 @@ def create_app(config_name='default'):
     from .api import api as api_blueprint
     app.register_blueprint(api_blueprint, url_prefix='/api/v1')
     
-    # Error handlers
+    # Error handlers. Error pages for anonymous visitors (mostly bots
+    # probing URLs) don't vary between requests, so each one is rendered
+    # once and the body reused; logged-in users and pages with pending
+    # flash messages are always rendered fresh.
+    error_pages = {}
+    
+    def render_error_page(template, status):
+        if current_user.is_authenticated or session.get('_flashes'):
+            return render_template(template), status
+        body = error_pages.get(template)
+        if body is None:
+            body = error_pages[template] = render_template(template)
+        return body, status
+    
     @app.errorhandler(404)
     def not_found_error(error):
-        return render_template('errors/404.html'), 404
+        return render_error_page('errors/404.html', 404)
     
     @app.errorhandler(500)
     def internal_error(error):
         db.session.rollback()
-        return render_template('errors/500.html'), 500
+        return render_error_page('errors/500.html', 500)
     
     @app.errorhandler(403)
     def forbidden_error(error):
-        return render_template('errors/403.html'), 403
+        return render_error_page('errors/403.html', 403)
     
     # Template filters
     @app.template_filter('format_currency')
@@ -73,23 +137,48 @@ def create_app(config_name='default'):
     
     @app.template_filter('time_ago')
     def time_ago(value):
-        now = datetime.utcnow()
-        diff = now - value
+        seconds = int((datetime.utcnow() - value).total_seconds())
         
-        if diff < timedelta(minutes=1):
+        if seconds < 60:
             return 'just now'
-        elif diff < timedelta(hours=1):
-            minutes = int(diff.seconds / 60)
+        elif seconds < 3600:
+            minutes = seconds // 60
             return f'{minutes} minute{"s" if minutes > 1 else ""} ago'
-        elif diff < timedelta(days=1):
-            hours = int(diff.seconds / 3600)
+        elif seconds < 86400:
+            hours = seconds // 3600
             return f'{hours} hour{"s" if hours > 1 else ""} ago'
-        elif diff < timedelta(days=30):
-            days = diff.days
+        elif seconds < 86400 * 30:
+            days = seconds // 86400
             return f'{days} day{"s" if days > 1 else ""} ago'
         else:
             return value.strftime('%B %d, %Y')
     
+    # CLI commands
+    @app.cli.command('init-db')
+    def init_db():
+        """Create all database tables."""
+        db.create_all()
+        click.echo('Initialized the database.')
+    
+    @app.cli.command('backfill-wallet-totals')
+    def backfill_wallet_totals():
+        """Recompute the stored wallet totals and savings goal amounts."""
+        Transaction.recalculate_user_totals()
+        SavingsGoal.recalculate_saved_amounts()
+        db.session.commit()
+        click.echo('Recalculated wallet totals and savings goal amounts.')
+    
+    @app.cli.command('normalize-emails')
+    def normalize_emails():
+        """Lowercase stored emails so login lookups match them exactly."""
+        db.session.execute(
+            update(User)
+            .where(User.email != func.lower(func.trim(User.email)))
+            .values(email=func.lower(func.trim(User.email)))
+        )
+        db.session.commit()
+        click.echo('Normalized user emails.')
+    
     # Shell context
     @app.shell_context_processor
     def make_shell_context():
@@ -103,7 +192,8 @@ def create_app(config_name='default'):
     
     return app
 
-# This is only used when running directly with Python
+# This is only used when running directly with Python (development server);
+# production deployments serve wsgi:application through Gunicorn
 if __name__ == '__main__':
     app = create_app()
     app.run(debug=True)
@@ -1,8 +1,6 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
-import re
 
 from .. import db
 from ..models.user import User
@@ -11,19 +9,30 @@ from .forms import LoginForm, RegistrationForm, ForgotPasswordForm, ResetPasswor
 # Create blueprint
 auth = Blueprint('auth', __name__)
 
+_SPECIAL_CHARACTERS = frozenset('!@#$%^&*(),.?":{}|<>')
+
 def is_strong_password(password):
     """Check if the password meets strength requirements."""
     if len(password) < 8:
         return False
-    if not re.search(r"[A-Z]", password):
-        return False
-    if not re.search(r"[a-z]", password):
-        return False
-    if not re.search(r"[0-9]", password):
-        return False
-    if not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
-        return False
-    return True
+    # Single pass, recording each character class seen as a bit
+    seen = 0
+    for char in password:
+        if 'A' <= char <= 'Z':
+            seen |= 1
+        elif 'a' <= char <= 'z':
+            seen |= 2
+        elif '0' <= char <= '9':
+            seen |= 4
+        elif char in _SPECIAL_CHARACTERS:
+            seen |= 8
+        if seen == 15:
+            return True
+    return False
+
+def _get_user_by_email(email):
+    """Look up a user by email via the unique index on the normalized address."""
+    return User.query.filter_by(email=email.strip().lower()).first()
 
 @auth.route('/login', methods=['GET', 'POST'])
 def login():
@@ -33,7 +42,7 @@ def login():
     
     form = LoginForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data).first()
+        user = _get_user_by_email(form.email.data)
         
         if user and user.check_password(form.password.data):
             login_user(user, remember=form.remember_me.data)
@@ -56,16 +65,7 @@ def register():
     
     form = RegistrationForm()
     if form.validate_on_submit():
-        # Check if username or email already exists
-        if User.query.filter_by(username=form.username.data).first():
-            flash('Username already taken. Please choose a different one.', 'danger')
-            return render_template('auth/register.html', form=form)
-        
-        if User.query.filter_by(email=form.email.data).first():
-            flash('Email already registered. Please use a different email or log in.', 'danger')
-            return render_template('auth/register.html', form=form)
-        
-        # Check password strength
+        # Check password strength (duplicates are rejected by the form)
         if not is_strong_password(form.password.data):
             flash('Password must be at least 8 characters long and include uppercase, lowercase, numbers, and special characters.', 'danger')
             return render_template('auth/register.html', form=form)
@@ -103,7 +103,7 @@ def forgot_password():
     
     form = ForgotPasswordForm()
     if form.validate_on_submit():
-        user = User.query.filter_by(email=form.email.data).first()
+        user = _get_user_by_email(form.email.data)
         if user:
             # In a real app, send a password reset email
             flash('If an account exists with this email, you will receive a password reset link.', 'info')
@@ -1,6 +1,8 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, DateField, validators
 from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationError
+from sqlalchemy import exists
+from .. import db
 from ..models.user import User
 
 class LoginForm(FlaskForm):
@@ -44,14 +46,12 @@ class RegistrationForm(FlaskForm):
 
     def validate_username(self, username):
         """Check if username is already taken."""
-        user = User.query.filter_by(username=username.data).first()
-        if user is not None:
+        if db.session.query(exists().where(User.username == username.data)).scalar():
             raise ValidationError('Please use a different username.')
 
     def validate_email(self, email):
         """Check if email is already registered."""
-        user = User.query.filter_by(email=email.data).first()
-        if user is not None:
+        if db.session.query(exists().where(User.email == email.data.strip().lower())).scalar():
             raise ValidationError('Please use a different email address.')
 
 
@@ -1,10 +1,52 @@
 import os
+import time
+from argon2 import PasswordHasher
 from dotenv import load_dotenv
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.pool import QueuePool, StaticPool
 
 # Load environment variables from .env file
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, '.env'))
 
+
+def engine_options(database_uri):
+    """Build SQLAlchemy engine options for the given database URI."""
+    if database_uri.startswith('sqlite'):
+        # Keep one long-lived connection per worker: reopening the .db,
+        # -wal and -shm files costs syscalls on every checkout, and a local
+        # file can't go stale so pinging it is wasted work. A request holds
+        # its connection until it ends, including while a gevent greenlet
+        # waits on socket I/O, so concurrent requests get short-lived
+        # overflow connections instead of queueing behind it. Pooled
+        # connections are shared across threads and wait on locks instead
+        # of failing straight away with SQLITE_BUSY.
+        return {
+            'poolclass': QueuePool,
+            'pool_size': 1,
+            'max_overflow': 20,
+            'pool_recycle': -1,
+            'pool_pre_ping': False,
+            'connect_args': {'check_same_thread': False, 'timeout': 30}
+        }
+    return {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_pre_ping': True
+    }
+
+
+def password_peppers():
+    """Collect the password peppers from the environment, keyed by version."""
+    peppers = {}
+    for entry in filter(None, os.environ.get('PASSWORD_OLD_PEPPERS', '').split(',')):
+        version, _, key = entry.partition(':')
+        peppers[int(version)] = key
+    if os.environ.get('PASSWORD_PEPPER'):
+        peppers[int(os.environ.get('PASSWORD_PEPPER_VERSION', '1'))] = os.environ['PASSWORD_PEPPER']
+    return peppers
+
+
 class Config:
     # Secret key for session management
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-change-in-production'
@@ -13,6 +55,7 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     
     # File upload configuration
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
@@ -27,6 +70,11 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@sparkos.app')
     
+    # Caching (use RedisCache with CACHE_REDIS_URL when running several workers)
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_DEFAULT_TIMEOUT = 300
+    
     # Pagination
     ITEMS_PER_PAGE = 10
     
@@ -34,6 +82,20 @@ class Config:
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'false').lower() == 'true'
     REMEMBER_COOKIE_SECURE = os.environ.get('REMEMBER_COOKIE_SECURE', 'false').lower() == 'true'
     
+    # Password hashing (Argon2id, OWASP recommended 46 MiB / t=2 by default).
+    # Tune so one hash stays under ~500 ms on the target host; the measured
+    # time is logged at startup.
+    ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', '2'))
+    ARGON2_MEMORY_COST_KIB = int(os.environ.get('ARGON2_MEMORY_COST_KIB', str(46 * 1024)))
+    ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM', '1'))
+    
+    # Secret HMAC pepper applied before Argon2; keep it outside the database.
+    # To rotate, bump PASSWORD_PEPPER_VERSION and list the previous keys in
+    # PASSWORD_OLD_PEPPERS ("version:key,...") until users have logged in again.
+    PASSWORD_PEPPERS = password_peppers()
+    PASSWORD_PEPPER_VERSION = int(os.environ.get('PASSWORD_PEPPER_VERSION', '1')) \
+        if os.environ.get('PASSWORD_PEPPER') else None
+    
     # Application settings
     APP_NAME = 'SparkOS'
     APP_DESCRIPTION = 'A digital space where teens can grow, learn, and have fun.'
@@ -55,25 +117,68 @@ class Config:
         # Create upload folder if it doesn't exist
         if not os.path.exists(Config.UPLOAD_FOLDER):
             os.makedirs(Config.UPLOAD_FOLDER)
+        
+        # Measure one password hash with the configured cost
+        hasher = PasswordHasher(
+            time_cost=app.config['ARGON2_TIME_COST'],
+            memory_cost=app.config['ARGON2_MEMORY_COST_KIB'],
+            parallelism=app.config['ARGON2_PARALLELISM']
+        )
+        start = time.perf_counter()
+        hasher.hash('benchmark')
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        app.logger.info('Argon2 password hash took %.1f ms (t=%d, m=%d KiB, p=%d)',
+                        elapsed_ms, hasher.time_cost, hasher.memory_cost, hasher.parallelism)
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'data-dev.sqlite')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # OWASP's lower-memory Argon2id profile (19 MiB) keeps local logins snappy
+    ARGON2_MEMORY_COST_KIB = int(os.environ.get('ARGON2_MEMORY_COST_KIB', str(19 * 1024)))
 
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    # Keep a single in-memory database shared by every thread
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False}
+    } if SQLALCHEMY_DATABASE_URI == 'sqlite://' else engine_options(SQLALCHEMY_DATABASE_URI)
     WTF_CSRF_ENABLED = False
+    CACHE_TYPE = 'NullCache'
+    # Minimal hashing cost so tests don't spend seconds in the KDF
+    ARGON2_TIME_COST = 1
+    ARGON2_MEMORY_COST_KIB = 8
+    ARGON2_PARALLELISM = 1
 
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'data.sqlite')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SESSION_COOKIE_SECURE = True
     REMEMBER_COOKIE_SECURE = True
+    TEMPLATES_AUTO_RELOAD = False
+    # Unset lets Jinja pick a private per-user directory (mode 0700,
+    # ownership checked); an explicit path must not be writable by others
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR')
+    
+    @classmethod
+    def init_app(cls, app):
+        Config.init_app(app)
+        
+        # Persist compiled templates across worker restarts and compile
+        # every template now rather than on the first request that uses it
+        if cls.JINJA_BYTECODE_CACHE_DIR:
+            os.makedirs(cls.JINJA_BYTECODE_CACHE_DIR, mode=0o700, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cls.JINJA_BYTECODE_CACHE_DIR)
+        app.jinja_env.auto_reload = False
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
 
 
 # Configuration dictionary
@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from datetime import datetime, date, timedelta
-from sqlalchemy import func, or_
+from sqlalchemy import bindparam, func, or_, select
+from sqlalchemy.orm import load_only
 
 from .. import db
 from ..models.habit import Habit, HabitCompletion, Frequency
@@ -17,27 +18,47 @@ def index():
     """Display all habits with their completion status for today."""
     today = date.today()
     
-    # Get all active habits for the current user
-    habits_list = Habit.query.filter_by(user_id=current_user.id, is_active=True).all()
+    # Get all active habits for the current user, loading only the columns
+    # this page uses
+    habits_list = Habit.query\
+        .options(load_only(
+            Habit.id,
+            Habit.name,
+            Habit.frequency,
+            Habit.weekly_days,
+            Habit.monthly_days,
+            Habit.longest_streak,
+            Habit.is_active
+        ))\
+        .filter_by(user_id=current_user.id, is_active=True)\
+        .all()
+    habit_ids = [h.id for h in habits_list]
     
     # Get today's completions
-    completed_habit_ids = [
-        hc.habit_id for hc in HabitCompletion.query
-        .filter(
+    completed_habit_ids = set(db.session.execute(
+        select(HabitCompletion.habit_id).where(
             HabitCompletion.completion_date == today,
-            HabitCompletion.habit_id.in_([h.id for h in habits_list])
-        )
-    ]
-    
-    # Categorize habits
-    daily_habits = [h for h in habits_list if h.frequency == Frequency.DAILY]
-    weekly_habits = [h for h in habits_list if h.frequency == Frequency.WEEKLY and today.weekday() in h.weekly_days]
-    monthly_habits = [h for h in habits_list if h.frequency == Frequency.MONTHLY and today.day in h.monthly_days]
-    
-    # Calculate streaks for each habit
+            HabitCompletion.habit_id.in_(bindparam('habit_ids', expanding=True))
+        ),
+        {'habit_ids': habit_ids}
+    ).scalars())
+    
+    # Calculate streaks for all habits in one query
+    streaks = HabitCompletion.get_current_streaks(habit_ids, today)
+    
+    # Annotate and categorize habits in a single pass
+    today_weekday = today.weekday()
+    today_day = today.day
+    daily_habits, weekly_habits, monthly_habits = [], [], []
     for habit in habits_list:
-        habit.current_streak = habit.get_current_streak()
+        habit.current_streak = streaks[habit.id]
         habit.is_completed_today = habit.id in completed_habit_ids
+        if habit.frequency == Frequency.DAILY:
+            daily_habits.append(habit)
+        elif habit.frequency == Frequency.WEEKLY and today_weekday in habit.weekly_days:
+            weekly_habits.append(habit)
+        elif habit.frequency == Frequency.MONTHLY and today_day in habit.monthly_days:
+            monthly_habits.append(habit)
     
     # Get habit statistics for the dashboard
     total_habits = len(habits_list)
@@ -51,6 +72,7 @@ def index():
     
     # Get the most consistent habit
     most_consistent_habit = Habit.query\
+        .options(load_only(Habit.id, Habit.name, Habit.longest_streak))\
         .filter(Habit.user_id == current_user.id)\
         .order_by(Habit.longest_streak.desc())\
         .first()
@@ -106,8 +128,12 @@ def view_habit(habit_id):
     if habit.user_id != current_user.id:
         abort(403)
     
+    # Last 30 days + today, newest first
+    today = date.today()
+    day_range = tuple(today - timedelta(days=i) for i in range(31))
+    thirty_days_ago = day_range[-1]
+    
     # Get completion history (last 30 days)
-    thirty_days_ago = date.today() - timedelta(days=30)
     completions = HabitCompletion.query\
         .filter(
             HabitCompletion.habit_id == habit_id,
@@ -117,14 +143,12 @@ def view_habit(habit_id):
         .all()
     
     # Calculate completion rate
-    total_days = (date.today() - thirty_days_ago).days + 1
+    total_days = (today - thirty_days_ago).days + 1
     completion_rate = (len(completions) / total_days * 100) if total_days > 0 else 0
     
     # Prepare data for the calendar view
-    calendar_data = {}
-    for i in range(31):  # Last 30 days + today
-        day = date.today() - timedelta(days=i)
-        calendar_data[day] = any(c.completion_date == day for c in completions)
+    completed_dates = {c.completion_date for c in completions}
+    calendar_data = {day: day in completed_dates for day in day_range}
     
     return render_template('habits/view.html',
                          habit=habit,
@@ -209,27 +233,31 @@ def complete_habit(habit_id):
         completion_date=today
     ).first()
     
-    if existing_completion:
-        # Toggle completion status
-        db.session.delete(existing_completion)
-        message = 'Habit marked as not completed for today.'
-        completed = False
-    else:
-        # Add new completion
-        completion = HabitCompletion(
-            habit_id=habit_id,
-            completion_date=today,
-            created_at=datetime.utcnow()
-        )
-        db.session.add(completion)
-        message = 'Habit completed for today!'
-        completed = True
+    # Queue every change and write them together in a single flush at commit
+    with db.session.no_autoflush:
+        if existing_completion:
+            # Toggle completion status
+            db.session.delete(existing_completion)
+            message = 'Habit marked as not completed for today.'
+            completed = False
+        else:
+            # Add new completion
+            completion = HabitCompletion(
+                habit_id=habit_id,
+                completion_date=today,
+                created_at=datetime.utcnow()
+            )
+            db.session.add(completion)
+            message = 'Habit completed for today!'
+            completed = True
+        
+        # Update streak
+        habit.update_streak(completed)
         
         # Add XP points for completing a habit
-        current_user.add_xp(10)  # 10 XP per habit completion
+        if completed:
+            current_user.add_xp(10)  # 10 XP per habit completion
     
-    # Update streak
-    habit.update_streak(completed)
     db.session.commit()
     
     if request.is_json:
@@ -250,16 +278,24 @@ def complete_habit(habit_id):
 def get_habits_stats():
     """Get habit statistics for the dashboard."""
     # Get completion data for the last 7 days
-    seven_days_ago = date.today() - timedelta(days=6)
+    today = date.today()
+    week_days = tuple(today - timedelta(days=i) for i in range(7))
+    seven_days_ago = week_days[-1]
     
-    # Get active habits count
-    active_habits = Habit.query.filter_by(user_id=current_user.id, is_active=True).count()
+    # Fetch the per-habit figures once and derive the habit stats from them
+    habit_rows = db.session.query(
+        Habit.name,
+        Habit.longest_streak,
+        Habit.missed_days,
+        Habit.is_active
+    ).filter(Habit.user_id == current_user.id).all()
+    
+    active_habits = sum(1 for row in habit_rows if row.is_active)
+    most_consistent_habit = max(habit_rows, key=lambda row: row.longest_streak or 0, default=None)
+    most_missed_habit = max(habit_rows, key=lambda row: row.missed_days or 0, default=None)
     
     # Get completion data
-    completion_data = {}
-    for i in range(7):
-        day = date.today() - timedelta(days=i)
-        completion_data[day.strftime('%a')] = 0
+    completion_data = {day.strftime('%a'): 0 for day in week_days}
     
     # Get completions for the last 7 days
     completions = db.session.query(
@@ -276,18 +312,6 @@ def get_habits_stats():
         day_name = date_str.strftime('%a')
         completion_data[day_name] = count
     
-    # Get the most consistent habit
-    most_consistent_habit = Habit.query\
-        .filter(Habit.user_id == current_user.id)\
-        .order_by(Habit.longest_streak.desc())\
-        .first()
-    
-    # Get the most missed habit
-    most_missed_habit = Habit.query\
-        .filter(Habit.user_id == current_user.id)\
-        .order_by(Habit.missed_days.desc())\
-        .first()
-    
     return jsonify({
         'active_habits': active_habits,
         'completion_data': completion_data,
@@ -6,6 +6,28 @@ from datetime import datetime, timedelta
 
 from ..models.habit import Frequency
 
+# Static choice lists, built once at import
+_FREQUENCY_CHOICES = (
+    (Frequency.DAILY.value, 'Daily'),
+    (Frequency.WEEKLY.value, 'Weekly'),
+    (Frequency.MONTHLY.value, 'Monthly'),
+    (Frequency.CUSTOM.value, 'Custom')
+)
+
+_WEEKDAY_CHOICES = (
+    (0, 'Monday'),
+    (1, 'Tuesday'),
+    (2, 'Wednesday'),
+    (3, 'Thursday'),
+    (4, 'Friday'),
+    (5, 'Saturday'),
+    (6, 'Sunday')
+)
+
+_MONTHLY_DAY_CHOICES = tuple((i, str(i)) for i in range(1, 32))
+
+_FILTER_FREQUENCY_CHOICES = (('all', 'All Frequencies'),) + _FREQUENCY_CHOICES[:3]
+
 # Custom widget for multiple checkboxes
 class MultiCheckboxField(SelectMultipleField):
     widget = ListWidget(prefix_label=False)
@@ -24,12 +46,7 @@ class HabitForm(FlaskForm):
     ])
     
     frequency = SelectField('Frequency', 
-        choices=[
-            (Frequency.DAILY.value, 'Daily'),
-            (Frequency.WEEKLY.value, 'Weekly'),
-            (Frequency.MONTHLY.value, 'Monthly'),
-            (Frequency.CUSTOM.value, 'Custom')
-        ],
+        choices=_FREQUENCY_CHOICES,
         coerce=int,
         validators=[DataRequired()]
     )
@@ -45,22 +62,14 @@ class HabitForm(FlaskForm):
     
     # Weekly options (days of the week)
     weekly_days = MultiCheckboxField('Days of the Week',
-        choices=[
-            (0, 'Monday'),
-            (1, 'Tuesday'),
-            (2, 'Wednesday'),
-            (3, 'Thursday'),
-            (4, 'Friday'),
-            (5, 'Saturday'),
-            (6, 'Sunday')
-        ],
+        choices=_WEEKDAY_CHOICES,
         coerce=int,
         validators=[Optional()]
     )
     
     # Monthly options (days of the month)
     monthly_days = MultiCheckboxField('Days of the Month',
-        choices=[(i, str(i)) for i in range(1, 32)],
+        choices=_MONTHLY_DAY_CHOICES,
         coerce=int,
         validators=[Optional()]
     )
@@ -85,25 +94,29 @@ class HabitForm(FlaskForm):
     def validate(self, **kwargs):
         """Custom validation for the form."""
         # Run standard validators
-        if not super().validate():
+        if not super().validate(**kwargs):
             return False
         
+        # The checks below are independent, so report every failure at once;
+        # field.errors is a plain list after validation, never form.errors
+        valid = True
+        
         # Validate weekly days if frequency is weekly
         if self.frequency.data == Frequency.WEEKLY and not self.weekly_days.data:
             self.weekly_days.errors.append('Please select at least one day of the week')
-            return False
+            valid = False
         
         # Validate monthly days if frequency is monthly
         if self.frequency.data == Frequency.MONTHLY and not self.monthly_days.data:
             self.monthly_days.errors.append('Please select at least one day of the month')
-            return False
+            valid = False
         
         # Validate reminder time if enabled
         if self.enable_reminder.data and not self.reminder_time.data:
             self.reminder_time.errors.append('Please select a reminder time')
-            return False
+            valid = False
             
-        return True
+        return valid
 
 
 class HabitCompletionForm(FlaskForm):
@@ -129,7 +142,7 @@ class HabitCompletionForm(FlaskForm):
     
     completion_date = StringField('Completion Date', 
         validators=[DataRequired()],
-        default=datetime.now().strftime('%Y-%m-%d'),
+        default=lambda: datetime.now().strftime('%Y-%m-%d'),
         render_kw={'type': 'date'}
     )
     
@@ -139,12 +152,7 @@ class HabitCompletionForm(FlaskForm):
 class HabitFilterForm(FlaskForm):
     """Form for filtering habits."""
     frequency = SelectField('Frequency',
-        choices=[
-            ('all', 'All Frequencies'),
-            (Frequency.DAILY.value, 'Daily'),
-            (Frequency.WEEKLY.value, 'Weekly'),
-            (Frequency.MONTHLY.value, 'Monthly')
-        ],
+        choices=_FILTER_FREQUENCY_CHOICES,
         default='all',
         coerce=str
     )
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, load_only, object_session
 
+from .. import cache, db
 from ..models.user import User
 from ..models.habit import Habit, HabitCompletion
 from ..models.wallet import Transaction, SavingsGoal
@@ -10,54 +12,104 @@ from ..models.wallet import Transaction, SavingsGoal
 # Create blueprint
 main = Blueprint('main', __name__)
 
-@main.route('/')
-@login_required
-def index():
-    """Render the home page with user's dashboard."""
+@cache.memoize(timeout=30)
+def _dashboard_context(user_id):
+    """Query the dashboard data for a user, cached briefly to absorb refreshes."""
     # Get user's recent habits
-    recent_habits = Habit.query.filter_by(user_id=current_user.id)\
+    recent_habits = Habit.query\
+        .options(load_only(Habit.id, Habit.name, Habit.frequency, Habit.current_streak, Habit.last_updated))\
+        .filter_by(user_id=user_id)\
         .order_by(Habit.last_updated.desc())\
         .limit(5).all()
     
     # Get today's habit completions
     today = datetime.utcnow().date()
-    completed_habits = HabitCompletion.query\
-        .join(Habit, Habit.id == HabitCompletion.habit_id)\
-        .filter(Habit.user_id == current_user.id)\
-        .filter(func.date(HabitCompletion.completion_date) == today)\
-        .count()
+    user_habit_ids = select(Habit.id).where(Habit.user_id == user_id)
+    completed_habits = db.session.scalar(
+        select(func.count()).select_from(HabitCompletion).where(
+            HabitCompletion.habit_id.in_(user_habit_ids),
+            HabitCompletion.completion_date == today
+        )
+    )
     
     # Get recent transactions
     recent_transactions = Transaction.query\
-        .filter_by(user_id=current_user.id)\
+        .options(load_only(
+            Transaction.id,
+            Transaction.amount_cents,
+            Transaction.description,
+            Transaction.category,
+            Transaction.transaction_type,
+            Transaction.date
+        ))\
+        .filter_by(user_id=user_id)\
         .order_by(Transaction.date.desc())\
         .limit(5).all()
     
-    # Calculate wallet balance
-    income = Transaction.query\
-        .filter_by(user_id=current_user.id, transaction_type='income')\
-        .with_entities(func.sum(Transaction.amount))\
-        .scalar() or 0
-    
-    expenses = Transaction.query\
-        .filter_by(user_id=current_user.id, transaction_type='expense')\
-        .with_entities(func.sum(Transaction.amount))\
-        .scalar() or 0
-    
-    balance = income - expenses
-    
     # Get savings goals progress
     savings_goals = SavingsGoal.query\
-        .filter_by(user_id=current_user.id)\
+        .options(load_only(
+            SavingsGoal.id,
+            SavingsGoal.name,
+            SavingsGoal.target_amount,
+            SavingsGoal.saved_amount,
+            SavingsGoal.target_date,
+            SavingsGoal.is_completed
+        ))\
+        .filter_by(user_id=user_id)\
         .order_by(SavingsGoal.target_date.asc())\
         .limit(3).all()
     
+    return {
+        'recent_habits': recent_habits,
+        'completed_habits': completed_habits,
+        'recent_transactions': recent_transactions,
+        'savings_goals': savings_goals
+    }
+
+# Drop a user's cached dashboard whenever one of their rows changes
+def _dashboard_user_id(connection, target):
+    """Resolve the user whose dashboard a changed row belongs to."""
+    if isinstance(target, HabitCompletion):
+        return connection.scalar(select(Habit.user_id).where(Habit.id == target.habit_id))
+    return target.user_id
+
+def _invalidate_dashboard(mapper, connection, target):
+    # Only note the user during the flush; the entry is dropped once the
+    # change is committed, so no request can re-cache uncommitted rows
+    session = object_session(target)
+    session.info.setdefault('stale_dashboards', set()).add(_dashboard_user_id(connection, target))
+
+for _model in (Habit, HabitCompletion, Transaction, SavingsGoal):
+    for _event in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _event, _invalidate_dashboard)
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_dashboards(session):
+    for user_id in session.info.pop('stale_dashboards', ()):
+        cache.delete_memoized(_dashboard_context, user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_stale_dashboards(session):
+    session.info.pop('stale_dashboards', None)
+
+@main.route('/')
+@login_required
+def index():
+    """Render the home page with user's dashboard."""
+    context = _dashboard_context(current_user.id)
+    
+    # Cached rows come back detached; attach them to this request's
+    # session without reloading them
+    def attach(rows):
+        return [db.session.merge(row, load=False) for row in rows]
+    
     return render_template('index.html',
-                         recent_habits=recent_habits,
-                         completed_habits=completed_habits,
-                         recent_transactions=recent_transactions,
-                         balance=balance,
-                         savings_goals=savings_goals)
+                         recent_habits=attach(context['recent_habits']),
+                         completed_habits=context['completed_habits'],
+                         recent_transactions=attach(context['recent_transactions']),
+                         balance=current_user.wallet_balance,
+                         savings_goals=attach(context['savings_goals']))
 
 @main.route('/profile')
 @login_required
@@ -1,4 +1,5 @@
-from app import db
+from .. import db
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 class Habit(db.Model):
@@ -9,10 +10,19 @@ class Habit(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     frequency = db.Column(db.String(20), default='daily')  # daily, weekly, monthly
+    weekly_days = db.Column(db.JSON, default=list)  # weekday numbers, Monday = 0
+    monthly_days = db.Column(db.JSON, default=list)  # days of the month
     current_streak = db.Column(db.Integer, default=0)
     longest_streak = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_completed = db.Column(db.DateTime)
+    is_active = db.Column(db.Boolean, default=True)
+    last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_habit_user_active', 'user_id', 'is_active'),
+        db.Index('ix_habit_user_updated', 'user_id', 'last_updated'),
+    )
     
     # Relationship
     completions = db.relationship('HabitCompletion', backref='habit', lazy=True, cascade='all, delete-orphan')
@@ -55,3 +65,44 @@ class HabitCompletion(db.Model):
     __table_args__ = (
         db.UniqueConstraint('habit_id', 'completion_date', name='unique_habit_completion'),
     )
+    
+    @classmethod
+    def get_current_streaks(cls, habit_ids, today, window_days=90):
+        """Get the current streak of several habits with as few queries as possible.
+        
+        A streak counts back from today, or from yesterday if the habit has
+        not been completed yet today. Completions are loaded ``window_days``
+        at a time, and only habits whose streak reaches further back need
+        another query.
+        """
+        streaks = dict.fromkeys(habit_ids, 0)
+        completed = defaultdict(set)
+        one_day = timedelta(days=1)
+        pending = list(habit_ids)
+        loaded_from = today + one_day
+        
+        while pending:
+            window_start = loaded_from - timedelta(days=window_days)
+            rows = db.session.query(cls.habit_id, cls.completion_date).filter(
+                cls.habit_id.in_(pending),
+                cls.completion_date >= window_start,
+                cls.completion_date < loaded_from
+            ).all()
+            for habit_id, completion_date in rows:
+                completed[habit_id].add(completion_date)
+            loaded_from = window_start
+            
+            still_pending = []
+            for habit_id in pending:
+                dates = completed[habit_id]
+                day = today if today in dates else today - one_day
+                streak = 0
+                while day in dates:
+                    streak += 1
+                    day -= one_day
+                streaks[habit_id] = streak
+                # The streak ran off the loaded history; load further back
+                if day < loaded_from:
+                    still_pending.append(habit_id)
+            pending = still_pending
+        return streaks
@@ -1,10 +1,42 @@
+import hashlib
+import hmac
+import re
 from datetime import datetime, timezone
-from werkzeug.security import generate_password_hash, check_password_hash
+from functools import cached_property
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+from werkzeug.security import check_password_hash
 from flask_login import UserMixin
 from itsdangerous import URLSafeTimedSerializer as Serializer
 from flask import current_app
+from sqlalchemy.orm import validates
 from .. import db, login_manager
 
+
+def _password_hasher():
+    """Return the Argon2id hasher configured for the current app."""
+    hasher = current_app.extensions.get('argon2')
+    if hasher is None:
+        hasher = PasswordHasher(
+            time_cost=current_app.config['ARGON2_TIME_COST'],
+            memory_cost=current_app.config['ARGON2_MEMORY_COST_KIB'],
+            parallelism=current_app.config['ARGON2_PARALLELISM'],
+            hash_len=32
+        )
+        current_app.extensions['argon2'] = hasher
+    return hasher
+
+
+# Peppered hashes are stored as "pepper<version>:<argon2 hash>"
+_PEPPERED_HASH = re.compile(r'pepper(\d+):(.*)', re.DOTALL)
+
+
+def _pepper(password, version):
+    """HMAC-SHA256 the password with the configured pepper of the given version."""
+    key = current_app.config['PASSWORD_PEPPERS'][version]
+    return hmac.new(key.encode(), password.encode(), hashlib.sha256).digest()
+
+
 class User(UserMixin, db.Model):
     """User account model."""
     __tablename__ = 'users'
@@ -12,7 +44,7 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), index=True, unique=True, nullable=False)
     email = db.Column(db.String(120), index=True, unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(255))
     date_of_birth = db.Column(db.Date, nullable=False)
     join_date = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
@@ -22,6 +54,11 @@ class User(UserMixin, db.Model):
     level = db.Column(db.Integer, default=1)
     profile_image = db.Column(db.String(120), default='default.jpg')
     
+    # Running wallet totals, maintained by the Transaction write events in
+    # models/wallet.py so the dashboard doesn't re-sum the whole history
+    total_income = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    total_expense = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    
     # Relationships
     habits = db.relationship('Habit', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     transactions = db.relationship('Transaction', backref='user', lazy='dynamic', cascade='all, delete-orphan')
@@ -33,6 +70,11 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
     
+    @validates('email')
+    def normalize_email(self, key, email):
+        """Store emails lowercased so lookups can match them exactly."""
+        return email.strip().lower() if email else email
+    
     @property
     def password(self):
         """Prevent password from being accessed."""
@@ -41,15 +83,46 @@ class User(UserMixin, db.Model):
     @password.setter
     def password(self, password):
         """Set password to a hashed password."""
-        self.password_hash = generate_password_hash(password)
+        self.set_password(password)
     
     def set_password(self, password):
-        """Set password to a hashed password."""
-        self.password_hash = generate_password_hash(password)
+        """Set password to an Argon2id hash, peppered if a pepper is configured."""
+        version = current_app.config['PASSWORD_PEPPER_VERSION']
+        if version is None:
+            self.password_hash = _password_hasher().hash(password)
+        else:
+            self.password_hash = f'pepper{version}:' + _password_hasher().hash(_pepper(password, version))
     
     def check_password(self, password):
-        """Check if hashed password matches actual password."""
-        return check_password_hash(self.password_hash, password)
+        """Check if hashed password matches actual password.
+        
+        Hashes created with older parameters or pepper, or by the previous
+        Werkzeug PBKDF2 scheme, are upgraded in place on a successful check.
+        """
+        if not self.password_hash:
+            # Account without a password; nothing can match
+            return False
+        ph = _password_hasher()
+        match = _PEPPERED_HASH.fullmatch(self.password_hash)
+        if match:
+            version, argon2_hash = int(match.group(1)), match.group(2)
+            secret = _pepper(password, version)
+        else:
+            version, argon2_hash, secret = None, self.password_hash, password
+        
+        try:
+            ph.verify(argon2_hash, secret)
+        except VerifyMismatchError:
+            return False
+        except InvalidHashError:
+            # Legacy Werkzeug hash from before the switch to Argon2
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        if version != current_app.config['PASSWORD_PEPPER_VERSION'] or ph.check_needs_rehash(argon2_hash):
+            self.set_password(password)
+        return True
     
     def get_reset_token(self, expires_sec=1800):
         """Generate a password reset token."""
@@ -64,13 +137,16 @@ class User(UserMixin, db.Model):
             user_id = s.loads(token)['user_id']
         except:
             return None
-        return User.query.get(user_id)
+        return db.session.get(User, user_id)
     
     def add_xp(self, points):
-        """Add XP points to the user and check for level up."""
+        """Add XP points to the user and check for level up.
+        
+        Changes are only staged; the caller commits them along with the
+        rest of its unit of work.
+        """
         self.xp_points += points
         self.check_level_up()
-        db.session.commit()
     
     def check_level_up(self):
         """Check if user has enough XP to level up."""
@@ -85,31 +161,41 @@ class User(UserMixin, db.Model):
         # For example, unlock new features, give badges, etc.
         return self.level
     
-    def get_age(self):
-        """Calculate user's age based on date of birth."""
+    @property
+    def wallet_balance(self):
+        """Total income minus total expenses across all transactions."""
+        return (self.total_income or 0) - (self.total_expense or 0)
+    
+    @cached_property
+    def age(self):
+        """User's age based on date of birth, computed once per instance."""
         today = datetime.now(timezone.utc).date()
         return today.year - self.date_of_birth.year - ((today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
     
+    def get_age(self):
+        """Calculate user's age based on date of birth."""
+        return self.age
+    
     def to_dict(self):
         """Convert user object to dictionary for JSON serialization."""
         return {
             'id': self.id,
             'username': self.username,
             'email': self.email,
-            'date_of_birth': self.date_of_birth.isoformat(),
-            'join_date': self.join_date.isoformat(),
-            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'date_of_birth': self.date_of_birth,
+            'join_date': self.join_date,
+            'last_login': self.last_login,
             'xp_points': self.xp_points,
             'level': self.level,
             'profile_image': self.profile_image,
-            'age': self.get_age()
+            'age': self.age
         }
 
 # Flask-Login user loader
 @login_manager.user_loader
 def load_user(user_id):
     """Flask-Login user loader callback."""
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
 
 # Anonymous user class for Flask-Login
 class AnonymousUser:
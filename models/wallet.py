@@ -1,7 +1,11 @@
 from datetime import datetime, date
+from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
 from .. import db
+from .user import User
+from sqlalchemy import DDL, event, func, select, update
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm.attributes import get_history
 
 class TransactionType(Enum):
     """Enum for transaction types."""
@@ -35,13 +39,22 @@ class TransactionCategory(Enum):
     SAVINGS = 'Savings'
     OTHER = 'Other'
 
+def cents_to_amount(cents):
+    """Convert integer cents to a Decimal amount for display."""
+    return Decimal(cents or 0) / 100
+
+def amount_to_cents(amount):
+    """Convert a money amount to integer cents, rounding half up."""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
 class Transaction(db.Model):
     """Transaction model for tracking income and expenses."""
     __tablename__ = 'transactions'
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    # Money is stored as integer cents; use the amount property for Decimals
+    amount_cents = db.Column(db.BigInteger, nullable=False)
     description = db.Column(db.String(200), nullable=False)
     category = db.Column(db.Enum(TransactionCategory), nullable=False)
     transaction_type = db.Column(db.Enum(TransactionType), nullable=False)
@@ -54,6 +67,14 @@ class Transaction(db.Model):
     savings_goal_id = db.Column(db.Integer, db.ForeignKey('savings_goals.id'))
     savings_goal = db.relationship('SavingsGoal', back_populates='transactions')
     
+    # (user_id, date, type) also serves the plain (user_id, date) lookups;
+    # (user_id, type, date) serves per-type range sums
+    __table_args__ = (
+        db.Index('ix_txn_user_date_type', 'user_id', 'date', 'transaction_type'),
+        db.Index('ix_txn_user_type_date', 'user_id', 'transaction_type', 'date'),
+        db.Index('ix_txn_user_category', 'user_id', 'category'),
+    )
+    
     def __init__(self, **kwargs):
         super(Transaction, self).__init__(**kwargs)
         # Set default values
@@ -63,19 +84,47 @@ class Transaction(db.Model):
     def __repr__(self):
         return f'<Transaction {self.id}: {self.amount} for {self.description}>'
     
+    @hybrid_property
+    def amount(self):
+        """Transaction amount as a Decimal."""
+        if self.amount_cents is None:
+            return None
+        return cents_to_amount(self.amount_cents)
+    
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = None if value is None else amount_to_cents(value)
+    
+    @amount.expression
+    def amount(cls):
+        return cls.amount_cents / 100.0
+    
+    @hybrid_property
+    def search_text(self):
+        """Description and notes, as matched by the transaction search."""
+        return f'{self.description} {self.notes or ""}'
+    
+    @search_text.expression
+    def search_text(cls):
+        return cls.description + ' ' + func.coalesce(cls.notes, '')
+    
     def to_dict(self):
-        """Convert transaction to dictionary for JSON serialization."""
+        """Convert transaction to dictionary for JSON serialization.
+        
+        Dates are left as date/datetime objects; the app's orjson provider
+        serializes them natively.
+        """
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'amount': float(self.amount) if self.amount else 0.0,
+            'amount': self.amount_cents / 100 if self.amount_cents else 0.0,
             'description': self.description,
             'category': self.category.value if self.category else None,
             'type': self.transaction_type.value if self.transaction_type else None,
-            'date': self.date.isoformat() if self.date else None,
+            'date': self.date,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'savings_goal_id': self.savings_goal_id
         }
     
@@ -87,32 +136,134 @@ class Transaction(db.Model):
             year, month = today.year, today.month
         
         first_day = date(year, month, 1)
-        if month == 12:
-            last_day = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            last_day = date(year, month + 1, 1) - timedelta(days=1)
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
         
         # Get total income and expenses for the month
         result = db.session.query(
             db.func.sum(
-                db.case([(cls.transaction_type == TransactionType.INCOME, cls.amount)], else_=0)
+                db.case((cls.transaction_type == TransactionType.INCOME, cls.amount_cents), else_=0)
             ).label('total_income'),
             db.func.sum(
-                db.case([(cls.transaction_type == TransactionType.EXPENSE, cls.amount)], else_=0)
+                db.case((cls.transaction_type == TransactionType.EXPENSE, cls.amount_cents), else_=0)
             ).label('total_expenses')
         ).filter(
             cls.user_id == user_id,
-            cls.date.between(first_day, last_day)
+            cls.date >= first_day,
+            cls.date < next_month
         ).first()
         
-        total_income = float(result[0]) if result[0] else 0.0
-        total_expenses = float(result[1]) if result[1] else 0.0
+        total_income = cents_to_amount(result[0])
+        total_expenses = cents_to_amount(result[1])
         
         return {
             'total_income': total_income,
             'total_expenses': total_expenses,
             'savings': total_income - total_expenses
         }
+    
+    @classmethod
+    def recalculate_user_totals(cls):
+        """Recompute every user's stored income/expense totals from scratch."""
+        def total(transaction_type):
+            return select(func.coalesce(func.sum(cls.amount_cents), 0) / 100.0).where(
+                cls.user_id == User.id,
+                cls.transaction_type == transaction_type
+            ).scalar_subquery()
+        
+        db.session.execute(update(User).values(
+            total_income=total(TransactionType.INCOME),
+            total_expense=total(TransactionType.EXPENSE)
+        ))
+
+
+# On PostgreSQL a trigram index lets substring searches (ILIKE '%term%')
+# use an index instead of scanning every row of the user
+event.listen(
+    Transaction.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+db.Index(
+    'ix_txn_search_trgm',
+    Transaction.search_text.label('search_text'),
+    postgresql_using='gin',
+    postgresql_ops={'search_text': 'gin_trgm_ops'}
+).ddl_if(dialect='postgresql')
+
+
+def _wallet_totals(transaction_type, amount_cents):
+    """Return a transaction's (income, expense) contribution to the user totals."""
+    amount = cents_to_amount(amount_cents)
+    if transaction_type == TransactionType.INCOME:
+        return amount, 0
+    if transaction_type == TransactionType.EXPENSE:
+        return 0, amount
+    return 0, 0
+
+def _adjust_wallet_totals(connection, user_id, income, expense):
+    """Add signed deltas to a user's stored income/expense totals."""
+    if not income and not expense:
+        return
+    users = User.__table__
+    connection.execute(
+        update(users)
+        .where(users.c.id == user_id)
+        .values(
+            total_income=users.c.total_income + income,
+            total_expense=users.c.total_expense + expense
+        )
+    )
+
+def _adjust_saved_amount(connection, goal_id, amount):
+    """Add a signed amount to a savings goal's stored saved total."""
+    if goal_id is None or not amount:
+        return
+    goals = SavingsGoal.__table__
+    connection.execute(
+        update(goals)
+        .where(goals.c.id == goal_id)
+        .values(saved_amount=goals.c.saved_amount + amount)
+    )
+
+def _previous_value(target, key):
+    """Value of an attribute before the pending flush."""
+    history = get_history(target, key)
+    return history.deleted[0] if history.deleted else getattr(target, key)
+
+@event.listens_for(Transaction, 'after_insert')
+def _add_to_wallet_totals(mapper, connection, target):
+    income, expense = _wallet_totals(target.transaction_type, target.amount_cents)
+    _adjust_wallet_totals(connection, target.user_id, income, expense)
+    _adjust_saved_amount(connection, target.savings_goal_id, cents_to_amount(target.amount_cents))
+
+@event.listens_for(Transaction, 'after_delete')
+def _remove_from_wallet_totals(mapper, connection, target):
+    income, expense = _wallet_totals(target.transaction_type, target.amount_cents)
+    _adjust_wallet_totals(connection, target.user_id, -income, -expense)
+    _adjust_saved_amount(connection, target.savings_goal_id, -cents_to_amount(target.amount_cents))
+
+@event.listens_for(Transaction, 'after_update')
+def _update_wallet_totals(mapper, connection, target):
+    old_income, old_expense = _wallet_totals(
+        _previous_value(target, 'transaction_type'),
+        _previous_value(target, 'amount_cents')
+    )
+    new_income, new_expense = _wallet_totals(target.transaction_type, target.amount_cents)
+    old_user_id = _previous_value(target, 'user_id')
+    if old_user_id == target.user_id:
+        _adjust_wallet_totals(connection, target.user_id, new_income - old_income, new_expense - old_expense)
+    else:
+        _adjust_wallet_totals(connection, old_user_id, -old_income, -old_expense)
+        _adjust_wallet_totals(connection, target.user_id, new_income, new_expense)
+    
+    old_amount = cents_to_amount(_previous_value(target, 'amount_cents'))
+    new_amount = cents_to_amount(target.amount_cents)
+    old_goal_id = _previous_value(target, 'savings_goal_id')
+    if old_goal_id == target.savings_goal_id:
+        _adjust_saved_amount(connection, target.savings_goal_id, new_amount - old_amount)
+    else:
+        _adjust_saved_amount(connection, old_goal_id, -old_amount)
+        _adjust_saved_amount(connection, target.savings_goal_id, new_amount)
 
 
 class SavingsGoal(db.Model):
@@ -124,6 +275,9 @@ class SavingsGoal(db.Model):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     target_amount = db.Column(db.Numeric(10, 2), nullable=False)
+    # Sum of the goal's transactions, maintained by the Transaction write
+    # events above
+    saved_amount = db.Column(db.Numeric(10, 2), default=0, nullable=False)
     target_date = db.Column(db.Date)
     is_completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -131,7 +285,11 @@ class SavingsGoal(db.Model):
     completed_at = db.Column(db.DateTime)
     
     # Relationships
-    transactions = db.relationship('Transaction', back_populates='savings_goal')
+    transactions = db.relationship('Transaction', back_populates='savings_goal', lazy='dynamic')
+    
+    __table_args__ = (
+        db.Index('ix_goal_user_target', 'user_id', 'target_date'),
+    )
     
     def __init__(self, **kwargs):
         super(SavingsGoal, self).__init__(**kwargs)
@@ -150,12 +308,17 @@ class SavingsGoal(db.Model):
         return min(100.0, (float(saved) / float(self.target_amount)) * 100.0)
     
     def get_saved_amount(self):
-        """Calculate total saved amount from related transactions."""
-        if not self.transactions:
-            return 0.0
-        
-        total = sum(float(t.amount) for t in self.transactions)
-        return total
+        """Total saved amount from related transactions."""
+        return float(self.saved_amount or 0)
+    
+    @classmethod
+    def recalculate_saved_amounts(cls):
+        """Recompute every goal's stored saved amount from scratch."""
+        db.session.execute(update(cls).values(
+            saved_amount=select(func.coalesce(func.sum(Transaction.amount_cents), 0) / 100.0).where(
+                Transaction.savings_goal_id == cls.id
+            ).scalar_subquery()
+        ))
     
     def add_transaction(self, amount, description, date=None, notes=None):
         """Add a new transaction to this savings goal."""
@@ -175,7 +338,8 @@ class SavingsGoal(db.Model):
         
         db.session.add(transaction)
         
-        # Check if goal is completed
+        # Check if goal is completed; the stored total itself is
+        # updated when the transaction is flushed
         saved_amount = self.get_saved_amount() + float(amount)
         if not self.is_completed and saved_amount >= float(self.target_amount):
             self.is_completed = True
@@ -194,11 +358,11 @@ class SavingsGoal(db.Model):
             'description': self.description,
             'target_amount': float(self.target_amount) if self.target_amount else 0.0,
             'saved_amount': saved_amount,
-            'target_date': self.target_date.isoformat() if self.target_date else None,
+            'target_date': self.target_date,
             'progress': self.progress,
             'is_completed': self.is_completed,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'completed_at': self.completed_at,
             'days_remaining': (self.target_date - date.today()).days if self.target_date and not self.is_completed else 0
         }
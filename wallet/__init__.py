@@ -12,18 +12,6 @@ from .forms import TransactionForm, SavingsGoalForm, BudgetForm, TransferForm
 # Create blueprint
 wallet = Blueprint('wallet', __name__)
 
-# Common expense categories
-COMMON_EXPENSE_CATEGORIES = [
-    'Food & Dining', 'Shopping', 'Transportation', 'Bills & Utilities',
-    'Entertainment', 'Health & Medical', 'Education', 'Gifts & Donations',
-    'Personal Care', 'Travel', 'Groceries', 'Subscriptions', 'Other'
-]
-
-# Common income categories
-COMMON_INCOME_CATEGORIES = [
-    'Allowance', 'Gift', 'Job', 'Freelance', 'Investment', 'Other Income'
-]
-
 # Import route handlers
 from . import routes  # This will import all routes from routes.py
 
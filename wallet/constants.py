@@ -0,0 +1,17 @@
+"""Static wallet data shared by the forms and routes."""
+
+# Common expense categories
+EXPENSE_CATEGORIES = (
+    'Food & Dining', 'Shopping', 'Transportation', 'Bills & Utilities',
+    'Entertainment', 'Health & Medical', 'Education', 'Gifts & Donations',
+    'Personal Care', 'Travel', 'Groceries', 'Subscriptions', 'Other'
+)
+
+# Common income categories
+INCOME_CATEGORIES = (
+    'Allowance', 'Gift', 'Job', 'Freelance', 'Investment', 'Other Income'
+)
+
+# (value, label) pairs for category select fields
+EXPENSE_CHOICES = tuple(zip(EXPENSE_CATEGORIES, EXPENSE_CATEGORIES))
+INCOME_CHOICES = tuple(zip(INCOME_CATEGORIES, INCOME_CATEGORIES))
@@ -3,6 +3,22 @@ from wtforms import StringField, DecimalField, DateField, SelectField, TextAreaF
 from wtforms.validators import DataRequired, Optional, NumberRange, Length
 from datetime import date, timedelta
 from ..models.wallet import TransactionType, TransactionCategory
+from .constants import EXPENSE_CHOICES, INCOME_CHOICES
+
+# Fixed select choices, shared by every form instance
+_TYPE_CHOICES = (
+    (TransactionType.INCOME.value, 'Income'),
+    (TransactionType.EXPENSE.value, 'Expense')
+)
+_ACCOUNT_CHOICES = (
+    ('checking', 'Checking Account'),
+    ('savings', 'Savings Account')
+)
+_PERIOD_CHOICES = (
+    ('weekly', 'Weekly'),
+    ('monthly', 'Monthly'),
+    ('yearly', 'Yearly')
+)
 
 class TransactionForm(FlaskForm):
     """Form for adding/editing transactions."""
@@ -21,10 +37,7 @@ class TransactionForm(FlaskForm):
     ])
     
     transaction_type = SelectField('Type', 
-        choices=[
-            (TransactionType.INCOME.value, 'Income'),
-            (TransactionType.EXPENSE.value, 'Expense')
-        ],
+        choices=_TYPE_CHOICES,
         coerce=int,
         validators=[DataRequired()]
     )
@@ -46,27 +59,9 @@ class TransactionForm(FlaskForm):
         super(TransactionForm, self).__init__(*args, **kwargs)
         # Set default category choices based on transaction type
         if self.transaction_type.data == TransactionType.INCOME.value:
-            self.category.choices = [(c, c) for c in [
-                'Allowance', 'Gift', 'Job', 'Freelance', 'Investment', 'Other Income'
-            ]]
+            self.category.choices = INCOME_CHOICES
         else:
-            self.category.choices = [(c, c) for c in [
-                'Food & Dining', 'Shopping', 'Transportation', 'Bills & Utilities',
-                'Entertainment', 'Health & Medical', 'Education', 'Gifts & Donations',
-                'Personal Care', 'Travel', 'Groceries', 'Subscriptions', 'Other'
-            ]]
-    
-    def validate(self, **kwargs):
-        """Custom validation for the form."""
-        if not super().validate():
-            return False
-            
-        # Ensure amount is positive
-        if self.amount.data <= 0:
-            self.amount.errors.append('Amount must be greater than zero')
-            return False
-            
-        return True
+            self.category.choices = EXPENSE_CHOICES
 
 
 class SavingsGoalForm(FlaskForm):
@@ -115,10 +110,7 @@ class TransferForm(FlaskForm):
     ], places=2)
     
     from_account = SelectField('From Account', 
-        choices=[
-            ('checking', 'Checking Account'),
-            ('savings', 'Savings Account')
-        ],
+        choices=_ACCOUNT_CHOICES,
         default='checking',
         validators=[DataRequired()]
     )
@@ -149,25 +141,9 @@ class BudgetForm(FlaskForm):
     ], places=2)
     
     period = SelectField('Budget Period',
-        choices=[
-            ('weekly', 'Weekly'),
-            ('monthly', 'Monthly'),
-            ('yearly', 'Yearly')
-        ],
+        choices=_PERIOD_CHOICES,
         default='monthly',
         validators=[DataRequired()]
     )
     
     submit = SubmitField('Set Budget')
-    
-    def validate(self, **kwargs):
-        """Custom validation for the form."""
-        if not super().validate():
-            return False
-            
-        # Ensure amount is positive
-        if self.amount.data <= 0:
-            self.amount.errors.append('Amount must be greater than zero')
-            return False
-            
-        return True
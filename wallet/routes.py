@@ -1,59 +1,169 @@
 from flask import render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
-from datetime import datetime, date, timedelta
-from sqlalchemy import func, extract, and_, or_
+from datetime import date, timedelta
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import Float, case, event, func, extract, and_, or_, tuple_
+from sqlalchemy.orm import Session, load_only, object_session
 from decimal import Decimal
 
-from .. import db
-from ..models.wallet import Transaction, SavingsGoal, TransactionType
+from .. import cache, db
+from ..models.wallet import Transaction, SavingsGoal, TransactionType, cents_to_amount
 from . import wallet
 from .forms import TransactionForm, SavingsGoalForm, BudgetForm, TransferForm
 
-# Common categories
-COMMON_EXPENSE_CATEGORIES = [
-    'Food & Dining', 'Shopping', 'Transportation', 'Bills & Utilities',
-    'Entertainment', 'Health & Medical', 'Education', 'Gifts & Donations',
-    'Personal Care', 'Travel', 'Groceries', 'Subscriptions', 'Other'
-]
-
-COMMON_INCOME_CATEGORIES = [
-    'Allowance', 'Gift', 'Job', 'Freelance', 'Investment', 'Other Income'
-]
-
-# Wallet Dashboard
-@wallet.route('/')
-@login_required
-def index():
-    """Display the wallet dashboard with summary and recent transactions."""
-    today = date.today()
+@cache.memoize(timeout=120)
+def _dashboard_aggregates(user_id, today):
+    """Compute the wallet dashboard's monthly figures for a user.
+    
+    Cached per user and day; Transaction writes drop the entry.
+    """
     first_day = today.replace(day=1)
-    last_day = (first_day.replace(month=first_day.month % 12 + 1, day=1) - timedelta(days=1))
+    last_day = first_day + relativedelta(months=1) - timedelta(days=1)
+    trend_start = first_day - relativedelta(months=5)
+    trend_months = [trend_start + relativedelta(months=i) for i in range(6)]
+    
+    # New users have nothing to aggregate; skip straight to empty figures
+    has_transactions = db.session.query(
+        db.session.query(Transaction.id).filter(Transaction.user_id == user_id).exists()
+    ).scalar()
+    if not has_transactions:
+        return {
+            'has_transactions': False,
+            'monthly_income': cents_to_amount(0),
+            'monthly_expenses': cents_to_amount(0),
+            'spending_categories': [],
+            'spending_amounts': [],
+            'monthly_trend': [{'month': month_start.strftime('%b %Y'), 'amount': 0.0}
+                              for month_start in trend_months]
+        }
     
-    # Calculate monthly totals
-    monthly_income = db.session.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.transaction_type == TransactionType.INCOME,
+    # Calculate monthly totals in a single pass over the month
+    def monthly_total(transaction_type):
+        return func.coalesce(func.sum(
+            case((Transaction.transaction_type == transaction_type, Transaction.amount_cents), else_=0)
+        ), 0)
+    
+    income_cents, expense_cents = db.session.query(
+        monthly_total(TransactionType.INCOME),
+        monthly_total(TransactionType.EXPENSE)
+    ).filter(
+        Transaction.user_id == user_id,
         Transaction.date >= first_day,
         Transaction.date <= last_day
-    ).scalar() or 0
+    ).one()
     
-    monthly_expenses = db.session.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-        Transaction.user_id == current_user.id,
+    # Sums come back as floats in currency units rather than as per-row
+    # Decimals (PostgreSQL's SUM of a bigint is numeric)
+    def expense_total():
+        return (func.sum(Transaction.amount_cents).cast(Float) / 100).label('total')
+    
+    # Get spending by category
+    spending_by_category = db.session.query(
+        Transaction.category,
+        expense_total()
+    ).filter(
+        Transaction.user_id == user_id,
         Transaction.transaction_type == TransactionType.EXPENSE,
         Transaction.date >= first_day,
         Transaction.date <= last_day
-    ).scalar() or 0
+    ).group_by(Transaction.category).order_by(func.sum(Transaction.amount_cents).desc()).all()
+    
+    # Get monthly trend (last 6 months) in one grouped query, then fill
+    # in the months without expenses
+    trend_year = extract('year', Transaction.date).label('year')
+    trend_month = extract('month', Transaction.date).label('month')
+    expenses_by_month = {
+        (int(year), int(month)): total
+        for year, month, total in db.session.query(
+            trend_year,
+            trend_month,
+            expense_total()
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.transaction_type == TransactionType.EXPENSE,
+            Transaction.date >= trend_start,
+            Transaction.date <= last_day
+        ).group_by(trend_year, trend_month).all()
+    }
     
-    monthly_savings = monthly_income - monthly_expenses
+    monthly_trend = []
+    for month_start in trend_months:
+        monthly_trend.append({
+            'month': month_start.strftime('%b %Y'),
+            'amount': expenses_by_month.get((month_start.year, month_start.month), 0.0)
+        })
+    
+    return {
+        'has_transactions': True,
+        'monthly_income': cents_to_amount(income_cents),
+        'monthly_expenses': cents_to_amount(expense_cents),
+        'spending_categories': [row.category.value for row in spending_by_category],
+        'spending_amounts': [row.total for row in spending_by_category],
+        'monthly_trend': monthly_trend
+    }
+
+@cache.memoize(timeout=300)
+def _user_categories(user_id):
+    """Categories a user has transactions in, for the filter dropdown."""
+    return [category for category, in db.session.query(Transaction.category)
+            .filter(Transaction.user_id == user_id)
+            .distinct()
+            .all()]
+
+@event.listens_for(Transaction, 'after_insert')
+@event.listens_for(Transaction, 'after_update')
+@event.listens_for(Transaction, 'after_delete')
+def _invalidate_wallet_caches(mapper, connection, target):
+    # Dropped after commit so uncommitted rows never get re-cached
+    session = object_session(target)
+    session.info.setdefault('stale_wallets', set()).add(target.user_id)
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_wallets(session):
+    today = date.today()
+    for user_id in session.info.pop('stale_wallets', ()):
+        cache.delete_memoized(_dashboard_aggregates, user_id, today)
+        cache.delete_memoized(_user_categories, user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_stale_wallets(session):
+    session.info.pop('stale_wallets', None)
+
+# Wallet Dashboard
+@wallet.route('/')
+@login_required
+def index():
+    """Display the wallet dashboard with summary and recent transactions."""
+    today = date.today()
+    aggregates = _dashboard_aggregates(current_user.id, today)
+    monthly_savings = aggregates['monthly_income'] - aggregates['monthly_expenses']
     
     # Get recent transactions
-    recent_transactions = Transaction.query\
-        .filter_by(user_id=current_user.id)\
-        .order_by(Transaction.date.desc(), Transaction.created_at.desc())\
-        .limit(10).all()
+    recent_transactions = []
+    if aggregates['has_transactions']:
+        recent_transactions = Transaction.query\
+            .options(load_only(
+                Transaction.id,
+                Transaction.amount_cents,
+                Transaction.description,
+                Transaction.category,
+                Transaction.transaction_type,
+                Transaction.date
+            ))\
+            .filter_by(user_id=current_user.id)\
+            .order_by(Transaction.date.desc(), Transaction.created_at.desc())\
+            .limit(10).all()
     
     # Get active savings goals
     savings_goals = SavingsGoal.query\
+        .options(load_only(
+            SavingsGoal.id,
+            SavingsGoal.name,
+            SavingsGoal.target_amount,
+            SavingsGoal.saved_amount,
+            SavingsGoal.target_date,
+            SavingsGoal.is_completed
+        ))\
         .filter(
             SavingsGoal.user_id == current_user.id,
             or_(
@@ -64,66 +174,41 @@ def index():
         .order_by(SavingsGoal.target_date.asc())\
         .limit(3).all()
     
-    # Calculate progress for each goal
-    for goal in savings_goals:
-        goal.saved_amount = goal.get_saved_amount()
-        goal.progress = min(int((goal.saved_amount / goal.target_amount) * 100), 100)
-    
-    # Get spending by category
-    spending_by_category = db.session.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total_amount')
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.transaction_type == TransactionType.EXPENSE,
-        Transaction.date >= first_day,
-        Transaction.date <= last_day
-    ).group_by(Transaction.category).order_by(func.sum(Transaction.amount).desc()).all()
-    
-    # Prepare data for charts
-    categories = [category[0].value for category in spending_by_category]
-    amounts = [float(amount[1]) for amount in spending_by_category]
-    
-    # Get monthly trend (last 6 months)
-    monthly_trend = []
-    for i in range(5, -1, -1):
-        month_start = (today - timedelta(days=30*i)).replace(day=1)
-        month_end = (month_start.replace(month=month_start.month % 12 + 1, day=1) - timedelta(days=1))
-        
-        monthly_expense = db.session.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-            Transaction.user_id == current_user.id,
-            Transaction.transaction_type == TransactionType.EXPENSE,
-            Transaction.date >= month_start,
-            Transaction.date <= month_end
-        ).scalar() or 0
-        
-        monthly_trend.append({
-            'month': month_start.strftime('%b %Y'),
-            'amount': float(monthly_expense)
-        })
-    
     return render_template('wallet/index.html',
-                         monthly_income=monthly_income,
-                         monthly_expenses=monthly_expenses,
                          monthly_savings=monthly_savings,
                          recent_transactions=recent_transactions,
                          savings_goals=savings_goals,
-                         spending_categories=categories,
-                         spending_amounts=amounts,
-                         monthly_trend=monthly_trend)
+                         **aggregates)
+
+@wallet.route('/api/summary')
+@login_required
+def summary():
+    """Return the dashboard chart data as JSON, for refreshing charts without a page reload."""
+    aggregates = _dashboard_aggregates(current_user.id, date.today())
+    return jsonify({
+        'categories': aggregates['spending_categories'],
+        'amounts': aggregates['spending_amounts'],
+        'trend': aggregates['monthly_trend']
+    })
 
 # Transactions
 @wallet.route('/transactions')
 @login_required
 def transactions():
-    """Display all transactions with filtering and pagination."""
+    """Display all transactions with filtering and pagination.
+    
+    Pages are keyset-paginated: the after_date and after_id arguments
+    identify the last row of the previous page, so each page is
+    an index seek rather than an OFFSET scan, and no COUNT is needed.
+    """
     # Get filter parameters
     transaction_type = request.args.get('type', 'all')
     category = request.args.get('category', 'all')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     search = request.args.get('search', '').strip()
-    page = request.args.get('page', 1, type=int)
+    after_date = request.args.get('after_date')
+    after_id = request.args.get('after_id', type=int)
     per_page = 15
     
     # Build query
@@ -138,44 +223,53 @@ def transactions():
     
     if start_date:
         try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            start_date = date.fromisoformat(start_date)
             query = query.filter(Transaction.date >= start_date)
         except ValueError:
             pass
     
     if end_date:
         try:
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            end_date = date.fromisoformat(end_date)
             query = query.filter(Transaction.date <= end_date)
         except ValueError:
             pass
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Transaction.description.ilike(search_term),
-                Transaction.notes.ilike(search_term)
-            )
-        )
+        query = query.filter(Transaction.search_text.ilike(f"%{search}%"))
+    
+    # Continue after the previous page's last row
+    if after_date and after_id is not None:
+        try:
+            cursor = (date.fromisoformat(after_date), after_id)
+            query = query.filter(tuple_(Transaction.date, Transaction.id) < cursor)
+        except ValueError:
+            pass
     
-    # Get paginated transactions
+    # Fetch one extra row to learn whether there is a next page. Ids grow
+    # with insertion, so they order same-day rows newest first.
     transactions = query.order_by(
         Transaction.date.desc(),
-        Transaction.created_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+        Transaction.id.desc()
+    ).limit(per_page + 1).all()
+    has_next = len(transactions) > per_page
+    transactions = transactions[:per_page]
     
-    # Get available categories for filter dropdown
-    categories = db.session.query(Transaction.category)\
-        .filter(Transaction.user_id == current_user.id)\
-        .distinct()\
-        .all()
+    next_cursor = None
+    if has_next:
+        last = transactions[-1]
+        next_cursor = {
+            'after_date': last.date.isoformat(),
+            'after_id': last.id
+        }
     
     return render_template('wallet/transactions.html',
                          transactions=transactions,
+                         has_next=has_next,
+                         next_cursor=next_cursor,
                          transaction_type=transaction_type,
                          category=category,
                          start_date=start_date,
                          end_date=end_date,
                          search=search,
-                         categories=[c[0] for c in categories])
+                         categories=_user_categories(current_user.id))
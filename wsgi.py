@@ -0,0 +1,16 @@
+"""WSGI entry point for production servers.
+
+Run with gevent workers, e.g.:
+
+    gunicorn -k gevent -w $(nproc) -b 0.0.0.0:8000 wsgi:application
+"""
+# Patch the standard library before anything else imports it so that
+# socket I/O yields to other greenlets
+from gevent import monkey
+monkey.patch_all()
+
+import os
+
+from app import create_app
+
+application = create_app(os.getenv('FLASK_CONFIG', 'production'))